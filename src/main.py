@@ -1,59 +1,99 @@
-import os
+import asyncio
+import atexit
+import logging
+import secrets
 import stripe
-import uuid
-from dotenv import load_dotenv
+import threading
+from email.mime.text import MIMEText
 from dataclasses import dataclass, field
+from functools import lru_cache
 from stripe import Charge
-from stripe.error import StripeError
-from pydantic import BaseModel
-from typing import Optional, Protocol
+from stripe import StripeError
+from pathlib import Path
+from pydantic import BaseModel, ConfigDict, PrivateAttr, SecretStr
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Awaitable, Callable, Literal, Optional, Protocol, TextIO
+
+class Settings(BaseSettings):
+    stripe_api_key: SecretStr
+    stripe_price_id: str = ""
+
+    model_config = SettingsConfigDict(
+        env_file=Path(__file__).resolve().parent.parent / ".env",
+        extra="ignore",
+    )
+
+# Loaded once at startup; a missing STRIPE_API_KEY fails here rather than on
+# the first transaction.
+SETTINGS = Settings()
+
+log = logging.getLogger(__name__)
 
-_ = load_dotenv()
+# Pin the *_async calls to aiohttp (Stripe would otherwise pick httpx when it
+# is installed). Its session pools connections for the whole event loop, so
+# TCP/TLS setup is paid once per run. The session is bound to that loop:
+# close it with stripe.default_http_client.close_async() before the loop ends.
+stripe.default_http_client = stripe.RequestsClient(
+    async_fallback_client=stripe.AIOHTTPClient()
+)
 
 class ContactInfo(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     email: Optional[str] = None
     phone: Optional[str] = None
 
 class CustomerData(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     name: str
     contact_info: ContactInfo
     customer_id: Optional[str] = None
+    _preferred_channel: Literal["email", "phone"] = PrivateAttr(default="email")
+
+    def model_post_init(self, __context):
+        # Resolved once here (model_construct runs this too) so notifier
+        # dispatch is a single attribute read.
+        self._preferred_channel = "email" if self.contact_info.email else "phone"
+
+    @property
+    def preferred_channel(self) -> Literal["email", "phone"]:
+        return self._preferred_channel
 
 class PaymentData (BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     amount: int
     source: str
 
 class PaymentResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     status: str
     amount: int
     transaction_id: Optional[str] = None
     message: Optional[str]= None
 
-@dataclass
-class CustomerValidator:
-    def validate(self, customer_data: CustomerData):
-        if not customer_data.name:
-            print("Invalid customer data: missing name")
-            raise ValueError("Invalid customer data: missing name")
-        if not customer_data.contact_info:
-            print("Invalid customer data: missing contact info")
-            raise ValueError("Invalid customer data: missing contact info")
-        if not (
-            customer_data.contact_info.email
-            or customer_data.contact_info.phone
-        ):
-            print("Invalid customer data: missing email and phone")
-            raise ValueError("Invalid customer data: missing email and phone")
+_CUSTOMER_CHECKS = (
+    (lambda c: bool(c.name), "missing name"),
+    (lambda c: c.contact_info is not None, "missing contact info"),
+    (lambda c: bool(c.contact_info.email or c.contact_info.phone), "missing email and phone"),
+)
 
-@dataclass
-class PaymentValidator:
-    def validate(self, payment_data: PaymentData):
-        if not payment_data.source:
-            print("Invalid payment data: missing source")
-            raise ValueError("Invalid payment data: missing source")
-        if payment_data.amount <= 0:
-            print("Invalid payment data: amount must be positive")
-            raise ValueError("Invalid payment data: amount must be positive")
+_PAYMENT_CHECKS = (
+    (lambda p: bool(p.source), "missing source"),
+    (lambda p: p.amount > 0, "amount must be positive"),
+)
+
+def validate_customer(customer_data: CustomerData):
+    for ok, msg in _CUSTOMER_CHECKS:
+        if not ok(customer_data):
+            raise ValueError(f"Invalid customer data: {msg}")
+
+def validate_payment(payment_data: PaymentData):
+    for ok, msg in _PAYMENT_CHECKS:
+        if not ok(payment_data):
+            raise ValueError(f"Invalid payment data: {msg}")
 
 class Notifier(Protocol):
 
@@ -64,7 +104,7 @@ class Notifier(Protocol):
     should provide a method `send_confirmation` that sends a confirmation
     to the customer.
     """
-    def send_confirmation(seld, customer_data: CustomerData): 
+    async def send_confirmation(seld, customer_data: CustomerData): 
         """Send a confirmation notification to the customer.
 
         :param customer_data: Data about the customer to notify.
@@ -73,60 +113,140 @@ class Notifier(Protocol):
         ...
 
 class EmailNotifier(Notifier):
-    def send_confirmation(self, customer_data: CustomerData):
+    async def send_confirmation(self, customer_data: CustomerData):
         #Responsabilidad de la notificacion
-        from email.mime.text import MIMEText
-
         msg = MIMEText("Thank you for your payment.")
         msg["Subject"] = "Payment Confirmation"
         msg["From"] = "no-reply@example.com"
         msg["To"] = customer_data.contact_info.email or ""
 
-        # server = smtplib.SMTP("localhost")
-        # server.send_message(msg)
-        # server.quit()
-        print("Email sent to", customer_data.contact_info.email)
+        # await aiosmtplib.send(msg, hostname="localhost")
+        log.info("Email sent to %s", customer_data.contact_info.email)
 
 @dataclass
 class SmsNotifier(Notifier):
     sms_gateway: str
 
-    def send_confirmation(self, customer_data: CustomerData):
+    async def send_confirmation(self, customer_data: CustomerData):
         #Responsabilidad de la notificacion
         phone_number = customer_data.contact_info.phone
         sms_gateway = "the custom SMS Gateway"
-        print(
-            f"send the sms using {self.sms_gateway}: SMS sent to {phone_number}: Thank you for your payment."
+        log.info(
+            "send the sms using %s: SMS sent to %s: Thank you for your payment.",
+            self.sms_gateway,
+            phone_number,
+        )
+
+@dataclass
+class CompositeNotifier(Notifier):
+    email_notifier: Notifier
+    sms_notifier: Notifier
+    _notifiers: dict[str, Notifier] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._notifiers = {
+            "email": self.email_notifier,
+            "phone": self.sms_notifier,
+        }
+
+    async def send_confirmation(self, customer_data: CustomerData):
+        await self._notifiers[customer_data.preferred_channel].send_confirmation(
+            customer_data
         )
 
 @dataclass
 class TransactionLogger:
+    path: str = "transactions.log"
+    flush_every: int = 32
+    flush_interval: float = 1.0
+    _fh: Optional[TextIO] = field(init=False, default=None, repr=False)
+    _pending: int = field(init=False, default=0, repr=False)
+    _timer: Optional[threading.Timer] = field(init=False, default=None, repr=False)
+    _closing_registered: bool = field(init=False, default=False, repr=False)
+    _lock: threading.RLock = field(init=False, default_factory=threading.RLock, repr=False)
+
+    def _file(self) -> TextIO:
+        # The log file is opened on first use and kept open, records are
+        # flushed to disk every `flush_every` writes, at most `flush_interval`
+        # seconds after being written, and on exit.
+        if self._fh is None:
+            self._fh = open(self.path, "a", buffering=8192)
+            if not self._closing_registered:
+                atexit.register(self.close)
+                self._closing_registered = True
+        return self._fh
+
+    def _write(self, *records: str):
+        # Records may be written from worker threads (asyncio.to_thread).
+        if not records:
+            return
+        with self._lock:
+            self._file().writelines(records)
+            self._pending += len(records)
+            if self._pending >= self.flush_every:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._fh is not None:
+                self._fh.flush()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
     def log_transaction(
         self,
         customer_data: CustomerData,
         payment_data: PaymentData,
         payment_response: PaymentResponse,
     ):
-        with open("transactions.log", "a") as log_file:
-            log_file.write(
-                f"{customer_data.name} paid {payment_data.amount}\n"
-            )
-            log_file.write(f"Payment status: {payment_response.status}\n")
-            if payment_response.transaction_id:
-                log_file.write(
-                    f"Transaction ID: {payment_response.transaction_id}\n"
-                )
-            log_file.write(f"Message: {payment_response.message}\n")
+        self._write(
+            self._format_transaction(customer_data, payment_data, payment_response)
+        )
+
+    def log_transactions(
+        self,
+        entries: list[tuple[CustomerData, PaymentData, PaymentResponse]],
+    ):
+        self._write(*[self._format_transaction(*entry) for entry in entries])
+
+    @staticmethod
+    def _format_transaction(
+        customer_data: CustomerData,
+        payment_data: PaymentData,
+        payment_response: PaymentResponse,
+    ) -> str:
+        parts = [
+            f"{customer_data.name} paid {payment_data.amount}\n",
+            f"Payment status: {payment_response.status}\n",
+        ]
+        if payment_response.transaction_id:
+            parts.append(f"Transaction ID: {payment_response.transaction_id}\n")
+        parts.append(f"Message: {payment_response.message}\n")
+        return "".join(parts)
 
     def log_refund(
         self, transaction_id: str, refund_response: PaymentResponse
     ):
-        with open("transactions.log", "a") as log_file:
-            log_file.write(
-                f"Refund processed for transaction {transaction_id}\n"
-            )
-            log_file.write(f"Refund status: {refund_response.status}\n")
-            log_file.write(f"Message: {refund_response.message}\n")
+        self._write(
+            "".join([
+                f"Refund processed for transaction {transaction_id}\n",
+                f"Refund status: {refund_response.status}\n",
+                f"Message: {refund_response.message}\n",
+            ])
+        )
 
 
 class PaymentProcessorProtocol(Protocol):
@@ -137,89 +257,116 @@ class PaymentProcessorProtocol(Protocol):
     should provide methods for processing payments, refunds, and setting up recurring payments.
     """
        
-    def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: ...
+    async def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: ...
 
 class RefundPaymentProtocol(Protocol):
-    def refund_payment(self, transaction_id: str) -> PaymentResponse: ...
+    async def refund_payment(self, transaction_id: str) -> PaymentResponse: ...
 
 class RecurringPaymentProtocol(Protocol):
-    def setup_recurring_payment(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: ...
+    async def setup_recurring_payment(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: ...
 
 
+@lru_cache(maxsize=4096)
+def _description_for(name: str) -> str:
+    return f"Charge for {name}"
+
+
+@dataclass
 class StripePaymentProcessor(PaymentProcessorProtocol, RefundPaymentProtocol, RecurringPaymentProtocol):
+    settings: Settings = field(default_factory=lambda: SETTINGS, repr=False)
+    _charge_create: Callable[..., Awaitable[stripe.Charge]] = field(init=False, repr=False)
+    _refund_create: Callable[..., Awaitable[stripe.Refund]] = field(init=False, repr=False)
+    _sub_create: Callable[..., Awaitable[stripe.Subscription]] = field(init=False, repr=False)
 
-    def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
+    def __post_init__(self):
+        stripe.api_key = self.settings.stripe_api_key.get_secret_value()
+        self._charge_create = stripe.Charge.create_async
+        self._refund_create = stripe.Refund.create_async
+        self._sub_create = stripe.Subscription.create_async
 
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
+    async def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
 
         #Responsabilidad de procesamiento del pago
         try:
-            charge = stripe.Charge.create(
+            charge = await self._charge_create(
                 amount=payment_data.amount,
                 currency="usd",
                 source=payment_data.source,
-                description="Charge for " + customer_data.name,
+                description=_description_for(customer_data.name),
             )
-            print("Payment successful")
-            return PaymentResponse(
+            log.info("Payment successful")
+            return PaymentResponse.model_construct(
                     status=charge["status"],
                     amount=charge["amount"],
                     transaction_id=charge["id"],
                     message="Payment successful",
                 )
         except StripeError as e:
-            print("Payment failed:", e)
-            return PaymentResponse(
+            log.warning("Payment failed: %s", e)
+            return PaymentResponse.model_construct(
                 status="failed",
                 amount=payment_data.amount,
                 transaction_id=None,
                 message=str(e),
             )
     
-    def refund_payment(self, transaction_id: str) -> PaymentResponse: 
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
+    async def refund_payment(self, transaction_id: str) -> PaymentResponse: 
         try:
-            refund = stripe.Refund.create(charge=transaction_id)
-            print("Refund successful")
-            return PaymentResponse(
+            refund = await self._refund_create(charge=transaction_id)
+            log.info("Refund successful")
+            return PaymentResponse.model_construct(
                 status=refund["status"],
                 amount=refund["amount"],
                 transaction_id=refund["id"],
                 message="Refund successful",
             )
         except StripeError as e:
-            print("Refund failed:", e)
-            return PaymentResponse(
+            log.warning("Refund failed: %s", e)
+            return PaymentResponse.model_construct(
                 status="failed",
                 amount=0,
                 transaction_id=None,
                 message=str(e),
             )
     
-    def setup_recurring_payment(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: 
-
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
+    async def setup_recurring_payment(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse: 
 
-        price_id = os.getenv("STRIPE_PRICE_ID", "")
+        price_id = self.settings.stripe_price_id
         try:
-            customer = self._get_or_create_customer(customer_data)
-
-            payment_method = self._attach_payment_method(
-                customer.id, payment_data.source
-            )
-
-            self._set_default_payment_method(customer.id, payment_method.id)
-
-            subscription = stripe.Subscription.create(
-                customer=customer.id,
-                items=[
-                    {"price": price_id},
-                ],
-                expand=["latest_invoice.payment_intent"],
-            )
+            if customer_data.customer_id:
+                customer_id = customer_data.customer_id
+                payment_method = await self._attach_payment_method(
+                    customer_id, payment_data.source
+                )
+                # The subscription already bills payment_method, so it does not
+                # wait on the invoice default update, which is best-effort.
+                subscription, default_result = await asyncio.gather(
+                    self._create_subscription(customer_id, payment_method.id, price_id),
+                    self._set_default_payment_method(customer_id, payment_method.id),
+                    return_exceptions=True,
+                )
+                if isinstance(subscription, BaseException):
+                    raise subscription
+                if isinstance(default_result, StripeError):
+                    log.warning(
+                        "Could not set default payment method for customer %s: %s",
+                        customer_id,
+                        default_result,
+                    )
+                elif isinstance(default_result, BaseException):
+                    raise default_result
+            else:
+                customer = await self._create_customer(
+                    customer_data, payment_data.source
+                )
+                subscription = await self._create_subscription(
+                    customer.id, payment_data.source, price_id
+                )
 
-            print("Recurring payment setup successful")
-            amount = subscription["items"]["data"][0]["price"]["unit_amount"]
+            log.info("Recurring payment setup successful")
+            # unit_amount is None for tiered and metered prices, so this
+            # response is validated rather than built with model_construct.
+            amount = subscription["items"]["data"][0]["price"]["unit_amount"] or 0
             return PaymentResponse(
                 status=subscription["status"],
                 amount=amount,
@@ -227,137 +374,229 @@ class StripePaymentProcessor(PaymentProcessorProtocol, RefundPaymentProtocol, Re
                 message="Recurring payment setup successful",
             )
         except StripeError as e:
-            print("Recurring payment setup failed:", e)
-            return PaymentResponse(
+            log.warning("Recurring payment setup failed: %s", e)
+            return PaymentResponse.model_construct(
                 status="failed",
                 amount=0,
                 transaction_id=None,
                 message=str(e),
             )
         
-    def _get_or_create_customer(self, customer_data: CustomerData) -> stripe.Customer:
+    async def _create_customer(self, customer_data: CustomerData, payment_method_id: str) -> stripe.Customer:
         """
-        Creates a new customer in Stripe or retrieves an existing one.
+        Creates a new customer in Stripe with the payment method attached
+        and set as the default in the same request.
         """
-        if customer_data.customer_id:
-            customer = stripe.Customer.retrieve(customer_data.customer_id)
-            print(f"Customer retrieved: {customer.id}")
-        else:
-            if not customer_data.contact_info.email:
-                raise ValueError("Email required for subscriptions")
-            customer = stripe.Customer.create(
-                name=customer_data.name, email=customer_data.contact_info.email
-            )
-            print(f"Customer created: {customer.id}")
+        if not customer_data.contact_info.email:
+            raise ValueError("Email required for subscriptions")
+        customer = await stripe.Customer.create_async(
+            name=customer_data.name,
+            email=customer_data.contact_info.email,
+            payment_method=payment_method_id,
+            invoice_settings={
+                "default_payment_method": payment_method_id,
+            },
+        )
+        log.info("Customer created: %s", customer.id)
         return customer
 
-    def _attach_payment_method(self, customer_id: str, payment_source: str) -> stripe.PaymentMethod:
+    async def _attach_payment_method(self, customer_id: str, payment_source: str) -> stripe.PaymentMethod:
         """
         Attaches a payment method to a customer.
         """
-        payment_method = stripe.PaymentMethod.retrieve(payment_source)
-        stripe.PaymentMethod.attach(
-            payment_method.id,
+        payment_method = await stripe.PaymentMethod.attach_async(
+            payment_source,
             customer=customer_id,
         )
-        print(
-            f"Payment method {payment_method.id} attached to customer {customer_id}"
+        log.info(
+            "Payment method %s attached to customer %s",
+            payment_method.id,
+            customer_id,
         )
         return payment_method
 
-    def _set_default_payment_method(self, customer_id: str, payment_method_id: str) -> None:
+    async def _set_default_payment_method(self, customer_id: str, payment_method_id: str) -> None:
         """
         Sets the default payment method for a customer.
         """
-        stripe.Customer.modify(
+        await stripe.Customer.modify_async(
             customer_id,
             invoice_settings={
                 "default_payment_method": payment_method_id,
             },
         )
-        print(f"Default payment method set for customer {customer_id}")
+        log.info("Default payment method set for customer %s", customer_id)
+
+    async def _create_subscription(self, customer_id: str, payment_method_id: str, price_id: str) -> stripe.Subscription:
+        """
+        Creates a subscription charged to the given payment method.
+        """
+        return await self._sub_create(
+            customer=customer_id,
+            items=[
+                {"price": price_id},
+            ],
+            default_payment_method=payment_method_id,
+            expand=["latest_invoice.payment_intent"],
+        )
 
 class OfflinePaymentProcessor(PaymentProcessorProtocol):
-    def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
+    async def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
 
-        print("Processing offline payment for: ", customer_data.name)
+        log.info("Processing offline payment for: %s", customer_data.name)
         return PaymentResponse(
             status= "success",
             amount= payment_data.amount,
-            transaction_id= str(uuid.uuid4()),
+            transaction_id= secrets.token_hex(16),
             message= "Offline payment success"
         )
 
 @dataclass
 class PaymentService:
-    customer_validator = CustomerValidator()
-    payment_validator = PaymentValidator()
     payment_processor: PaymentProcessorProtocol 
     notifier: Notifier
     logger = TransactionLogger()
     recurring_processor: Optional[RecurringPaymentProtocol] = None
     refund_processor: Optional[RefundPaymentProtocol] = None
 
-    def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
-        self.customer_validator.validate(customer_data)
-        self.payment_validator.validate(payment_data)
-        payment_response = self.payment_processor.process_transaction(
+    async def process_transaction(self, customer_data: CustomerData, payment_data: PaymentData) -> PaymentResponse:
+        validate_customer(customer_data)
+        validate_payment(payment_data)
+        payment_response = await self.payment_processor.process_transaction(
             customer_data, payment_data
         )
-        self.notifier.send_confirmation(customer_data)
-        self.logger.log_transaction(
-            customer_data, payment_data, payment_response
+        await asyncio.gather(
+            self.notifier.send_confirmation(customer_data),
+            asyncio.to_thread(
+                self.logger.log_transaction,
+                customer_data, payment_data, payment_response,
+            ),
         )
         return payment_response
 
-    def process_refund(self, transaction_id: str):
+    async def process_transactions(
+        self, pairs: list[tuple[CustomerData, PaymentData]]
+    ) -> list[PaymentResponse]:
+        """
+        Processes a batch of transactions concurrently.
+
+        Invalid or failed items get a "failed" response instead of aborting
+        the batch; responses are returned in the same order as `pairs`.
+        """
+        responses: dict[int, PaymentResponse] = {}
+        valid: list[int] = []
+        for i, (customer_data, payment_data) in enumerate(pairs):
+            try:
+                validate_customer(customer_data)
+                validate_payment(payment_data)
+            except ValueError as e:
+                responses[i] = PaymentResponse(
+                    status="failed",
+                    amount=payment_data.amount,
+                    transaction_id=None,
+                    message=str(e),
+                )
+            else:
+                valid.append(i)
+
+        results = await asyncio.gather(
+            *[self.payment_processor.process_transaction(*pairs[i]) for i in valid],
+            return_exceptions=True,
+        )
+        processed: list[int] = []
+        for i, result in zip(valid, results):
+            if isinstance(result, Exception):
+                # process_transaction would have raised this; keep the batch
+                # going but leave a trace in both logs.
+                log.error(
+                    "Transaction for %s raised", pairs[i][0].name, exc_info=result
+                )
+                responses[i] = PaymentResponse(
+                    status="failed",
+                    amount=pairs[i][1].amount,
+                    transaction_id=None,
+                    message=str(result),
+                )
+            elif isinstance(result, BaseException):
+                # CancelledError, KeyboardInterrupt, ...: not a payment failure
+                raise result
+            else:
+                responses[i] = result
+                processed.append(i)
+
+        await asyncio.gather(
+            *[self.notifier.send_confirmation(pairs[i][0]) for i in processed],
+            asyncio.to_thread(
+                self.logger.log_transactions,
+                [(*pairs[i], responses[i]) for i in valid],
+            ),
+        )
+        return [responses[i] for i in range(len(pairs))]
+
+    async def process_refund(self, transaction_id: str):
         if not self.refund_processor: 
             raise Exception("This processor does not suppot refunds")
-        refund_response= self.refund_processor.refund_payment(transaction_id)
-        self.logger.log_refund(transaction_id, refund_response)
+        refund_response= await self.refund_processor.refund_payment(transaction_id)
+        await asyncio.to_thread(
+            self.logger.log_refund, transaction_id, refund_response
+        )
         return refund_response
 
-    def setup_recurring(self, customer_data:CustomerData, payment_data: PaymentData):
+    async def setup_recurring(self, customer_data:CustomerData, payment_data: PaymentData):
         if not self.recurring_processor: 
             raise Exception("This processor does not suppot recurring")
-        recurring_response= self.recurring_processor.setup_recurring_payment(customer_data, payment_data)
-        self.logger.log_transaction(customer_data, payment_data, recurring_response)
+        recurring_response= await self.recurring_processor.setup_recurring_payment(customer_data, payment_data)
+        await asyncio.to_thread(
+            self.logger.log_transaction,
+            customer_data, payment_data, recurring_response,
+        )
         return recurring_response
 
 
-if __name__ == "__main__":
-     # Set up the payment processors
+async def main():
+    # Set up the payment processors
     stripe_processor = StripePaymentProcessor()
-    offline_processor = OfflinePaymentProcessor()
     email_notifier = EmailNotifier()
-    sms_notifier = SmsNotifier(gateway= "CustomGateway")
-    customer_validator = CustomerValidator()
-    payment_validator = PaymentValidator()
-    logger = TransactionLogger()
+    sms_notifier = SmsNotifier(sms_gateway= "CustomGateway")
 
     payment_service = PaymentService(
         payment_processor= stripe_processor,
-        notifier=email_notifier,
-        customer_validator= customer_validator,
-        payment_validator= payment_validator,
-        logger= logger,
+        notifier= CompositeNotifier(email_notifier, sms_notifier),
         recurring_processor= stripe_processor,
         refund_processor= stripe_processor
     )
 
-    second_payment_service = PaymentService(
-        payment_processor= offline_processor,
-        notifier=sms_notifier,
-        customer_validator= customer_validator,
-        payment_validator= payment_validator,
-        logger= logger,
+    customer_data_with_email = CustomerData.model_validate(
+        {"name": "John Doe", "contact_info": {"email": "john@example.com"}}
     )
+    customer_data_with_phone = CustomerData.model_validate(
+        {"name": "Platzi Python", "contact_info": {"phone": "1234567890"}}
+    )
+    payment_data = PaymentData(amount=100, source= "tok_visa")
+
+    try:
+        # Both charges are in flight at the same time; let both finish before
+        # the shared client is closed, even if one of them fails.
+        results = await asyncio.gather(
+            payment_service.process_transaction(customer_data_with_email, payment_data),
+            payment_service.process_transaction(customer_data_with_phone, payment_data),
+            return_exceptions=True,
+        )
+    finally:
+        # The aiohttp session is bound to this event loop
+        if stripe.default_http_client is not None:
+            await stripe.default_http_client.close_async()
 
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
 
 
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
 
-
-
+    asyncio.run(main())
 
     # offline_processor = OfflinePaymentProcessor()
 